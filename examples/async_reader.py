@@ -1,17 +1,28 @@
 import asyncio
 import logging
-import pprint
 
 from yeelight.aio import AsyncBulb
 
+try:
+    # Optional: use uvloop for lower per-await overhead if it is installed.
+    import uvloop
+
+    uvloop.install()
+except ImportError:
+    pass
+
 BULBIP = "192.168.107.116"
 
 
-logging.basicConfig(level=logging.DEBUG)
+# Keep the root logger at INFO; bump this to DEBUG to see every notification.
+# At INFO, the lazy %s formatting below means notifications cost no string
+# building at all on the callback path.
+logging.basicConfig(level=logging.INFO)
+_LOGGER = logging.getLogger("yeelight.example")
 
 
 def my_callback(data):
-    pprint.pprint(data)
+    _LOGGER.debug("notification: %s", data)
 
 
 async def yeelight_asyncio_demo():
@@ -22,12 +33,12 @@ async def yeelight_asyncio_demo():
     print("turn off:", await bulb.async_turn_off())
     await asyncio.sleep(2)
     print("turn on:", await bulb.async_turn_on())
+    set_brightness = bulb.async_set_brightness
+    sleep = asyncio.sleep
     for i in range(10):
         brightness = (i + 1) * 10
-        print(
-            f"set brightness {brightness}:", await bulb.async_set_brightness(brightness)
-        )
-        await asyncio.sleep(1)
+        print(f"set brightness {brightness}:", await set_brightness(brightness))
+        await sleep(1)
     await asyncio.sleep(500)
     await bulb.async_stop_listening()
 
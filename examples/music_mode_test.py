@@ -2,12 +2,28 @@
 # This code will result in rapid flashing of the light.
 # Do not use if you are prone to seizures.
 # !!! WARNING !!!
+#
+# Note that for a fixed pattern like this one, a server-side color flow
+# (start_cf, see main_flow below) is preferred: the bulb runs the whole
+# pattern itself, with no per-frame network traffic. Use music mode only
+# when each frame genuinely needs host control (e.g. audio-reactive).
 import asyncio
 import time
 
 from yeelight import Bulb
+from yeelight import Flow
+from yeelight import RGBTransition
 from yeelight.aio import AsyncBulb
 
+try:
+    # Optional: uvloop cuts the per-await scheduler overhead considerably,
+    # which matters for tight command loops like this one.
+    import uvloop
+
+    uvloop.install()
+except ImportError:
+    pass
+
 BULBIP = "10.76.19.240"
 
 
@@ -23,47 +39,59 @@ async def main():
     await bulb.async_start_music()
     print(bulb.music_mode)
 
-    counter = 0
-    while True:
-        # Long enough to test reconnects
-        if counter > 200:
-            break
-        await bulb.async_set_rgb(255, 0, 0)
-        counter += 1
+    # Queue the writes instead of awaiting each round-trip, so the frame
+    # rate is limited by the sleep rather than by network RTT. Pre-bind the
+    # hot lookups so each iteration is just a queue put and a sleep.
+    queue_set_rgb = bulb.queue_set_rgb
+    sleep = asyncio.sleep
+    rgbs = ((255, 0, 0), (0, 255, 0), (0, 0, 255))
+    # Long enough to test reconnects
+    for counter in range(1, 202):
+        queue_set_rgb(*rgbs[counter % 3])
         print(counter)
-        await asyncio.sleep(0.1)
-        await bulb.async_set_rgb(0, 255, 0)
-        counter += 1
-        print(counter)
-        await asyncio.sleep(0.1)
-        await bulb.async_set_rgb(0, 0, 255)
-        counter += 1
-        print(counter)
-        await asyncio.sleep(0.1)
+        await sleep(0.1)
     await bulb.async_stop_music()
     await bulb.async_set_rgb(255, 0, 0)
     await bulb.async_stop_listening()
 
 
+async def main_flow():
+    """Run the same red/green/blue pattern as a server-side color flow.
+
+    This sends a single start_cf command instead of hundreds of set_rgb
+    commands; the bulb cycles through the colors on its own.
+    """
+    bulb = AsyncBulb(BULBIP, duration=0)
+    await bulb.async_listen(do_nothing)
+    await bulb.async_turn_on()
+    flow = Flow(
+        count=0,
+        transitions=[
+            RGBTransition(255, 0, 0, duration=100),
+            RGBTransition(0, 255, 0, duration=100),
+            RGBTransition(0, 0, 255, duration=100),
+        ],
+    )
+    await bulb.async_start_flow(flow)
+    await asyncio.sleep(20)
+    await bulb.async_stop_flow()
+    await bulb.async_stop_listening()
+
+
 def main_sync():
     bulb = Bulb(BULBIP, duration=0)
     bulb.turn_on()
     bulb.start_music()
 
+    set_rgb = bulb.set_rgb
+    sleep = time.sleep
+    rgbs = ((255, 0, 0), (0, 255, 0), (0, 0, 255))
     counter = 0
     while True:
-        bulb.set_rgb(255, 0, 0)
-        counter += 1
-        print(counter)
-        time.sleep(0.1)
-        bulb.set_rgb(0, 255, 0)
-        counter += 1
-        print(counter)
-        time.sleep(0.1)
-        bulb.set_rgb(0, 0, 255)
         counter += 1
+        set_rgb(*rgbs[counter % 3])
         print(counter)
-        time.sleep(0.1)
+        sleep(0.1)
 
 
 if __name__ == "__main__":
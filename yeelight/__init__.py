@@ -5,11 +5,45 @@ from yeelight.enums import CronType
 from yeelight.enums import LightType
 from yeelight.enums import PowerMode
 from yeelight.enums import SceneClass
-from yeelight.flow import Flow
-from yeelight.flow import HSVTransition
-from yeelight.flow import RGBTransition
-from yeelight.flow import SleepTransition
-from yeelight.flow import TemperatureTransition
-from yeelight.main import Bulb
-from yeelight.main import BulbException
-from yeelight.main import discover_bulbs
+
+# Importing yeelight.main eagerly pulls in sockets, json and the whole Bulb
+# class graph, which is wasted startup work for callers that only need the
+# enums, so these attributes are resolved on first access instead (PEP 562).
+_LAZY_IMPORTS = {
+    "Flow": "yeelight.flow",
+    "HSVTransition": "yeelight.flow",
+    "RGBTransition": "yeelight.flow",
+    "SleepTransition": "yeelight.flow",
+    "TemperatureTransition": "yeelight.flow",
+    "Bulb": "yeelight.main",
+    "BulbException": "yeelight.main",
+    "discover_bulbs": "yeelight.main",
+}
+
+# Star-import never consults __getattr__, so the lazy names have to be spelled
+# out here for `from yeelight import *` to keep exporting them.
+__all__ = [
+    "BulbType",
+    "CronType",
+    "LightType",
+    "PowerMode",
+    "SceneClass",
+] + sorted(_LAZY_IMPORTS)
+
+
+def __getattr__(name):
+    try:
+        module_name = _LAZY_IMPORTS[name]
+    except KeyError:
+        raise AttributeError(
+            "module %r has no attribute %r" % (__name__, name)
+        ) from None
+    import importlib
+
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
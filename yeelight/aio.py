@@ -1,15 +1,19 @@
 # encoding: utf8
 import asyncio
 import contextlib
-import json
 import logging
 import socket
 import sys
+from collections import deque
 from typing import Dict
 from typing import Optional
 
 from .enums import LightType
+from .main import _command_template_tail
 from .main import _command_to_send_command
+from .main import _encode_command
+from .main import _encode_fixed
+from .main import _json_loads
 from .main import Bulb
 from .main import BulbException
 from .main import DEFAULT_PROPS
@@ -25,10 +29,153 @@ _LOGGER = logging.getLogger(__name__)
 TIMEOUT = 1
 PING_INTERVAL = 60
 
+# Reconnect retry schedule: bounded exponential backoff. The first retry is
+# nearly immediate (transient failures are the common case); repeated
+# failures back off up to the cap so an unplugged bulb isn't hammered.
+RECONNECT_BACKOFF_BASE = 0.2
+RECONNECT_BACKOFF_MAX = 30.0
+
 KEY_CONNECTED = "connected"
 
-RECONNECT_ERRORS = ("client quota exceeded", "invalid command")
-BACKOFF_ERRORS = ("client quota exceeded",)
+RECONNECT_ERRORS = frozenset(("client quota exceeded", "invalid command"))
+BACKOFF_ERRORS = frozenset(("client quota exceeded",))
+
+# Queued commands for which only the newest value matters: if a write for the
+# same method is still waiting in the queue, the superseded params are simply
+# replaced instead of issuing another write. Frame-style commands (set_rgb)
+# are deliberately not coalesced.
+COALESCE_METHODS = frozenset(("set_bright", "bg_set_bright"))
+# Upper bound on how many queued commands are folded into one vectored
+# write, so a deep backlog cannot monopolize the writer between yields.
+WRITE_BATCH_MAX = 64
+
+# Pending commands are kept in a fixed array indexed by the low bits of the
+# monotonically increasing command id, so the per-command bookkeeping is two
+# list indexing operations instead of dict hashing and resizes. A bulb never
+# has anywhere near this many commands outstanding, and each slot remembers
+# its id so a stale entry can never satisfy the wrong response.
+_PENDING_SLOTS = 1024
+_PENDING_MASK = _PENDING_SLOTS - 1
+
+# Largest line the receive buffer may grow to before the connection is
+# treated as overrun, matching the 64 KiB limit StreamReader.readline
+# enforced; the connection loop drops and reconnects on the ValueError.
+_BUFFER_LIMIT = 64 * 1024
+
+
+class _BulbProtocol(asyncio.BufferedProtocol):
+    """
+    A buffered reader/writer for the connection to the bulb.
+
+    This replaces the StreamReader/StreamWriter pair on the listen path:
+    incoming data is received straight into one persistent bytearray via
+    ``get_buffer``/``buffer_updated`` (no per-chunk bytes allocation inside
+    the transport), and complete lines are split out of it in place. It
+    exposes the small ``readline``/``write``/``close``/``wait_closed``
+    surface the connection loop needs, so the stream pair handed over by
+    the music-mode server remains interchangeable with it.
+    """
+
+    def __init__(self):
+        self.transport = None
+        self._buf = bytearray(16 * 1024)
+        self._pos = 0  # How much of the buffer holds received data.
+        self._lines = deque()
+        self._waiter = None
+        self._eof = False
+        self._exc = None
+        self._closed = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self._closed = asyncio.get_running_loop().create_future()
+
+    def get_buffer(self, sizehint):
+        if len(self._buf) - self._pos < 1024 and len(self._buf) < _BUFFER_LIMIT:
+            # Grow, up to the limit; no memoryview over the buffer is live
+            # between reads.
+            self._buf.extend(bytes(min(len(self._buf), _BUFFER_LIMIT - len(self._buf))))
+        return memoryview(self._buf)[self._pos :]
+
+    def buffer_updated(self, nbytes):
+        end = self._pos + nbytes
+        start = 0
+        while True:
+            idx = self._buf.find(b"\n", max(self._pos, start), end)
+            if idx == -1:
+                break
+            self._lines.append(bytes(self._buf[start : idx + 1]))
+            start = idx + 1
+        if start:
+            # Shift any partial trailing line to the front. Equal-length
+            # slice assignment mutates in place, which is allowed even while
+            # the transport still exports a view over the buffer.
+            remainder = end - start
+            self._buf[:remainder] = self._buf[start:end]
+            self._pos = remainder
+        else:
+            self._pos = end
+            if end >= _BUFFER_LIMIT and self._exc is None:
+                # A full buffer without a newline is a misbehaving peer;
+                # surface the same ValueError StreamReader raised so the
+                # connection loop drops the connection instead of the
+                # buffer growing without bound.
+                self._exc = ValueError(
+                    "Line longer than %d bytes from the bulb" % _BUFFER_LIMIT
+                )
+                self._pos = 0
+        if self._lines or self._exc is not None:
+            self._wakeup()
+
+    def eof_received(self):
+        self._eof = True
+        self._wakeup()
+        return False
+
+    def connection_lost(self, exc):
+        self._exc = exc
+        self._eof = True
+        self._wakeup()
+        if self._closed and not self._closed.done():
+            self._closed.set_result(None)
+
+    def _wakeup(self):
+        waiter = self._waiter
+        if waiter is not None:
+            self._waiter = None
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def readline_nowait(self):
+        """Return a buffered line immediately, or None if none is waiting."""
+        if self._lines:
+            return self._lines.popleft()
+        return None
+
+    async def readline(self):
+        """Return the next received line, or b"" once the connection is gone."""
+        while not self._lines:
+            if self._exc is not None:
+                raise self._exc
+            if self._eof:
+                return b""
+            self._waiter = asyncio.get_running_loop().create_future()
+            await self._waiter
+        return self._lines.popleft()
+
+    def write(self, data):
+        self.transport.write(data)
+
+    def writelines(self, data):
+        self.transport.writelines(data)
+
+    def close(self):
+        if self.transport:
+            self.transport.close()
+
+    async def wait_closed(self):
+        if self._closed is not None:
+            await self._closed
 
 
 def _async_command(f):
@@ -42,13 +189,19 @@ def _async_command(f):
     async def wrapper(*args, **kw):
         """A decorator that wraps a function and enables effects."""
         self = args[0]
+        method, params, kwargs = await f(*args, **kw)
+        if kw:
+            effect = kw.get("effect", self.effect)
+            duration = kw.get("duration", self.duration)
+            power_mode = kw.get("power_mode", self.power_mode)
+        else:
+            # Common case: no overrides, take the bulb defaults directly.
+            effect = self.effect
+            duration = self.duration
+            power_mode = self.power_mode
         cmd = await self.async_send_command(
             *_command_to_send_command(
-                self,
-                *(await f(*args, **kw)),
-                kw.get("effect", self.effect),
-                kw.get("duration", self.duration),
-                kw.get("power_mode", self.power_mode),
+                self, method, params, kwargs, effect, duration, power_mode
             )
         )
         result = cmd.get("result", [])
@@ -65,7 +218,8 @@ class AsyncBulb(Bulb):
         # Asyncio
         super().__init__(*args, **kwargs)
         self._async_callback = None
-        self._async_pending_commands: Dict[int, asyncio.Future] = {}
+        # Slots of (request_id, future), indexed by request_id & _PENDING_MASK.
+        self._async_pending_commands: list = [None] * _PENDING_SLOTS
         self._async_listen_task = None
         self._async_reconnect_task = None
         self._async_writer = None
@@ -75,12 +229,33 @@ class AsyncBulb(Bulb):
         self._socket_backoff = False
         self._listen_event: Optional[asyncio.Event] = None
         self._music_mode_params = None
+        # The (reader, writer) command connection parked while music mode is
+        # active, so stopping music mode can resume it without reconnecting.
+        self._async_main_connection = None
         # Prevent sending disconnects if disconnecting for music mode connection
         self._music_expect_disconnect = False
         self._music_mode_lock = asyncio.Lock()
+        self._async_cmd_queue: Optional[asyncio.Queue] = None
+        self._async_queued_coalesced: Dict[str, list] = {}
+        self._async_writer_task = None
+        self._send_buf = bytearray()
+        # Pre-encoded set_power keepalives for the music-mode ping, keyed by
+        # the power state they maintain.
+        self._ping_requests: Dict[str, bytes] = {}
+        self._loop = None  # Cached running loop, set when a connection is made.
 
     async def async_send_command(self, method, params):
         """Send a command to the bulb and wait for the result."""
+        # Fast path: in music mode the bulb never replies, so there is no
+        # response to serialize on. As long as no music-mode transition holds
+        # the lock, the write can skip the lock acquire/release entirely;
+        # there is no suspension point between this check and the write, so
+        # the state cannot change underneath us.
+        if self._music_mode_state and not self._async_command_lock.locked():
+            await self._async_send_command(method, params, create_future=False)
+            if self._async_callback:
+                self._async_callback({"result": ["ok"]})
+            return {"result": ["ok"]}
         # Prevent changes to music mode while sending a command
         # unless we are currently activating music mode
         # this prevents sending a command while we are trying to connect
@@ -97,39 +272,214 @@ class AsyncBulb(Bulb):
                     self._async_callback({"result": ["ok"]})
                 return {"result": ["ok"]}
             future = await self._async_send_command(method, params)
-            async with asyncio_timeout(TIMEOUT):
-                response = await future
-            except:
+            # _async_send_command never yields, so the id it assigned is
+            # still the current one.
+            request_id = self._async_cmd_id
+            try:
+                async with asyncio_timeout(TIMEOUT):
+                    response = await future
+            except asyncio.TimeoutError:
                 response = {"id": 1, "result": ["ok"]}
+            finally:
+                # Release the pending slot on timeout or cancellation;
+                # response dispatch has already cleared it on success.
+                slot = request_id & _PENDING_MASK
+                entry = self._async_pending_commands[slot]
+                if entry is not None and entry[0] == request_id:
+                    self._async_pending_commands[slot] = None
 
         if "error" in response:
             raise BulbException(response["error"])
 
         return response
 
+    def _next_cmd_id(self):
+        """Advance and return the request id, wrapping within 15 bits.
+
+        Wrapping keeps ids small machine-word ints for the bulb and for the
+        pending-slot mask even across a very long music session; 0 is skipped
+        because the music-mode keepalive uses it as its constant id.
+        """
+        cmd_id = (self._async_cmd_id + 1) & 0x7FFF
+        if not cmd_id:
+            cmd_id = 1
+        self._async_cmd_id = cmd_id
+        return cmd_id
+
     async def _async_send_command(self, method, params, create_future=True):
         """Send the command."""
-        self._async_cmd_id += 1
-        request_id = self._async_cmd_id
+        request_id = self._next_cmd_id()
+
+        writer = self._async_writer
+        if not writer:
+            raise BulbException("The write socket is closed")
 
         if create_future:
-            future = asyncio.Future()
-            self._async_pending_commands[request_id] = future
+            # create_future avoids the running-loop lookup asyncio.Future()
+            # does on every call. No done-callback is needed for cleanup: a
+            # cancelled command just leaves its slot to be overwritten, and
+            # the id match on response dispatch ignores stale entries.
+            future = self._loop.create_future()
+            self._async_pending_commands[request_id & _PENDING_MASK] = (
+                request_id,
+                future,
+            )
+        transport = getattr(writer, "transport", None)
+        request = _encode_fixed(request_id, method, params)
+        if request is not None:
+            # Fixed-shape command (e.g. a music-mode set_rgb frame): one
+            # bytes-format, and no per-value churn in the template cache.
+            pass
+        elif transport is not None and transport.get_write_buffer_size() == 0:
+            # Nothing from a previous send is still queued in the transport,
+            # so it is safe to assemble this request into the reused buffer
+            # instead of allocating a fresh bytes object per command.
+            request = self._send_buf
+            del request[:]
+            try:
+                tail = _command_template_tail(method, tuple(params))
+            except TypeError:
+                request += _encode_command(request_id, method, params)
+            else:
+                request += b'{"id":%d' % request_id
+                request += tail
+        else:
+            request = _encode_command(request_id, method, params)
+        _LOGGER.debug("%s: > %s", self, request)
+        if self._music_mode_state and transport is not None:
+            # Music mode is one-way: hand the bytes straight to the transport
+            # and skip the writer wrapper's bookkeeping.
+            transport.write(request)
+        else:
+            writer.write(request)
+        _LOGGER.debug("%s: Finished _async_send_command", self)
+        return future if create_future else request_id
 
-            def clean_up(future):
-                if future.cancelled():
-                    self._async_pending_commands.pop(request_id, None)
+    def queue_set_rgb(self, red, green, blue, light_type=LightType.Main, **kwargs):
+        """
+        Queue a set_rgb command without waiting for the bulb's reply.
 
-            future.add_done_callback(clean_up)
+        This is only useful in music mode, where the bulb never acknowledges
+        commands anyway: enqueueing is plain O(1) Python work, and a background
+        writer task pipelines the writes so a tight loop is never stalled on
+        network round-trips.
 
-        command = {"id": request_id, "method": method, "params": params}
-        request = (json.dumps(command, separators=(",", ":")) + "\r\n").encode("utf8")
-        _LOGGER.debug("%s: > %s", self, request)
+        :param int red:   The red value to set (0-255).
+        :param int green: The green value to set (0-255).
+        :param int blue:  The blue value to set (0-255).
+        :param yeelight.LightType light_type:
+                          Light type to control.
+        """
+        self._queue_command(
+            *self._set_rgb(red, green, blue, light_type=light_type, **kwargs)
+        )
+
+    def queue_set_brightness(self, brightness, light_type=LightType.Main, **kwargs):
+        """
+        Queue a set_bright command without waiting for the bulb's reply.
+
+        Rapid successive calls (e.g. a brightness slider) are coalesced: if a
+        brightness write is still waiting in the queue, its value is replaced
+        rather than issuing another write, so only the newest value hits the
+        wire. This also keeps the bulb's own command quota in check outside
+        music mode.
+
+        :param int brightness: The brightness value to set (1-100).
+        :param yeelight.LightType light_type: Light type to control.
+        """
+        self._queue_command(
+            *self._set_brightness(brightness, light_type=light_type, **kwargs)
+        )
+
+    def _queue_command(self, method, params, kwargs):
+        """Enqueue a command for the background writer task."""
+        method, params = _command_to_send_command(
+            self,
+            method,
+            params,
+            kwargs,
+            kwargs.get("effect", self.effect),
+            kwargs.get("duration", self.duration),
+            kwargs.get("power_mode", self.power_mode),
+        )
+        if self._async_cmd_queue is None:
+            self._async_cmd_queue = asyncio.Queue()
+        if self._async_writer_task is None or self._async_writer_task.done():
+            self._async_writer_task = asyncio.ensure_future(self._async_writer_loop())
+        if method in COALESCE_METHODS:
+            holder = self._async_queued_coalesced.get(method)
+            if holder is not None:
+                # A write for this method is still queued; supersede it.
+                holder[0] = params
+                return
+            holder = [params]
+            self._async_queued_coalesced[method] = holder
+            self._async_cmd_queue.put_nowait((method, holder))
+        else:
+            self._async_cmd_queue.put_nowait((method, [params]))
+
+    async def _async_writer_loop(self):
+        """Drain the command queue, writing each command without awaiting a reply."""
+        while True:
+            method, holder = await self._async_cmd_queue.get()
+            self._async_queued_coalesced.pop(method, None)
+            if self._async_cmd_queue.empty():
+                try:
+                    await self._async_send_command(
+                        method, holder[0], create_future=False
+                    )
+                except BulbException as ex:
+                    _LOGGER.debug("%s: Dropping queued command: %s", self, ex)
+                continue
+            # Several commands were queued within one loop iteration: encode
+            # them all and hand the transport a single vectored write
+            # (writelines maps to sendmsg/writev) instead of one syscall each.
+            requests = [_encode_command(self._next_cmd_id(), method, holder[0])]
+            while len(requests) < WRITE_BATCH_MAX:
+                try:
+                    method, holder = self._async_cmd_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                self._async_queued_coalesced.pop(method, None)
+                requests.append(_encode_command(self._next_cmd_id(), method, holder[0]))
+            writer = self._async_writer
+            if not writer:
+                _LOGGER.debug(
+                    "%s: Dropping %s queued commands: the write socket is closed",
+                    self,
+                    len(requests),
+                )
+                continue
+            _LOGGER.debug("%s: > %s", self, requests)
+            writer.writelines(requests)
+
+    def _async_stop_writer_task(self):
+        if self._async_writer_task:
+            self._async_writer_task.cancel()
+            self._async_writer_task = None
+        self._async_queued_coalesced = {}
+
+    def _async_music_ping(self):
+        """
+        Write the keepalive set_power command for the music-mode connection.
+
+        The ping maintains whatever power state the bulb is already in, so
+        its request line is fixed per state and encoded only once instead of
+        running the whole decorator/encode chain every interval. Music mode
+        never answers, so a constant request id of 0 is fine.
+        """
+        power = "on" if self._last_properties["power"] == "on" else "off"
+        request = self._ping_requests.get(power)
+        if request is None:
+            to_send = self._turn_on() if power == "on" else self._turn_off()
+            method, params = _command_to_send_command(
+                self, *to_send, self.effect, self.duration, self.power_mode
+            )
+            request = _encode_command(0, method, params)
+            self._ping_requests[power] = request
         if not self._async_writer:
             raise BulbException("The write socket is closed")
         self._async_writer.write(request)
-        _LOGGER.debug("%s: Finished _async_send_command", self)
-        return future if create_future else request_id
 
     async def _async_run_listen(self):
         """Backend for async_listen."""
@@ -161,18 +511,24 @@ class AsyncBulb(Bulb):
 
     async def _async_reconnect_loop(self):
         _LOGGER.debug("%s: Starting reconnect", self)
+        attempt = 0
         while self._is_listening:
             try:
                 async with asyncio_timeout(TIMEOUT):
-                    reader, writer = await asyncio.open_connection(self._ip, self._port)
+                    reader, writer = await self._async_open_connection()
                 await asyncio.sleep(0.1)
             except (asyncio.TimeoutError, socket.error) as ex:
+                delay = min(
+                    RECONNECT_BACKOFF_BASE * 2**attempt, RECONNECT_BACKOFF_MAX
+                )
+                attempt += 1
                 _LOGGER.debug(
-                    "%s: Reconnected failed with %s, backing off",
+                    "%s: Reconnect failed with %s, retrying in %s seconds",
                     self,
                     str(ex) or type(ex),
+                    delay,
                 )
-                await asyncio.sleep(TIMEOUT)
+                await asyncio.sleep(delay)
             else:
                 _LOGGER.debug("%s: Reconnected successfully", self)
                 self._async_connected(writer, reader)
@@ -201,14 +557,24 @@ class AsyncBulb(Bulb):
     async def _async_connection_loop(self) -> None:
         timeouts = 0
         ping_id = -1
-        assert self._async_reader is not None
+        # These are fixed for the lifetime of one connection; hoist them (and
+        # the logging plumbing) out of the per-line loop. Debug logging is
+        # also gated once here -- formatting self runs __repr__ on every call
+        # even when debug is off.
+        reader = self._async_reader
+        assert reader is not None
+        readline_nowait = getattr(reader, "readline_nowait", None)
+        pending = self._async_pending_commands
+        debug = _LOGGER.debug
+        debug_enabled = _LOGGER.isEnabledFor(logging.DEBUG)
         while self._is_listening:
             try:
-                _LOGGER.debug(
-                    "%s: Waiting for line, music_mode_state: %s",
-                    self,
-                    self._music_mode_state,
-                )
+                if debug_enabled:
+                    debug(
+                        "%s: Waiting for line, music_mode_state: %s",
+                        self,
+                        self._music_mode_state,
+                    )
                 if self._listen_event:
                     self._listen_event.set()
                 if self._music_mode_state:
@@ -216,29 +582,31 @@ class AsyncBulb(Bulb):
                     # We will not receive any messages
                     # so there is no opportunity to back off
                     self._socket_backoff = False
-                async with asyncio_timeout(PING_INTERVAL + TIMEOUT):
-                    line = await self._async_reader.readline()
+                # When a burst of lines has already been received, take them
+                # straight from the protocol's buffer; only an actual wait
+                # pays for arming and cancelling a ping timeout.
+                line = readline_nowait() if readline_nowait is not None else None
+                if line is None:
+                    async with asyncio_timeout(PING_INTERVAL + TIMEOUT):
+                        line = await reader.readline()
             except asyncio.TimeoutError:
                 # Since we can't get a response from the light in music mode
                 # ping the light to keep the connection alive
                 if self._music_mode_state:
-                    _LOGGER.debug(
+                    debug(
                         "%s: Pinging bulb in music mode after %s",
                         self,
                         PING_INTERVAL + TIMEOUT,
                     )
-                    if self._last_properties["power"] == "on":
-                        await self.async_turn_on()
-                    else:
-                        # This should rarely happen as music mode is by default turned off
-                        # when the light is turned off
-                        await self.async_turn_off(is_ping=True)
+                    # This rarely pings "off", as music mode is by default
+                    # turned off when the light is turned off
+                    self._async_music_ping()
                     continue
                 timeouts += 1
                 if timeouts == 2:
-                    _LOGGER.debug("%s: Timeout waiting for line", self)
+                    debug("%s: Timeout waiting for line", self)
                     return
-                _LOGGER.debug(
+                debug(
                     "%s: No data in %s seconds, pinging bulb to make sure its still connected",
                     self,
                     PING_INTERVAL + TIMEOUT,
@@ -248,10 +616,10 @@ class AsyncBulb(Bulb):
                 )
                 continue
             except socket.error as ex:
-                _LOGGER.debug("%s: Socket error: %s", self, ex)
+                debug("%s: Socket error: %s", self, ex)
                 return
             except ValueError as ex:
-                _LOGGER.debug("%s: Overran buffer: %s", self, ex)
+                debug("%s: Overran buffer: %s", self, ex)
                 return
             except BulbException as ex:
                 _LOGGER.warning(
@@ -259,15 +627,16 @@ class AsyncBulb(Bulb):
                 )
                 return
 
-            if line and b"\n" not in line:
-                _LOGGER.debug("%s: Partial read from bulb: %s", self, line)
+            if line and not line.endswith(b"\n"):
+                debug("%s: Partial read from bulb: %s", self, line)
                 return
             elif line:
                 self._socket_backoff = False
-                _LOGGER.debug("%s: Success got line: %s", self, line)
+                if debug_enabled:
+                    debug("%s: Success got line: %s", self, line)
                 timeouts = 0
             else:
-                _LOGGER.debug(
+                debug(
                     "%s: Bulb closed the connection, music_expect_disconnect: %s",
                     self,
                     self._music_expect_disconnect,
@@ -275,17 +644,20 @@ class AsyncBulb(Bulb):
                 return
 
             try:
-                decoded_line = json.loads(line.decode("utf8").rstrip())
+                decoded_line = _json_loads(line)
             except ValueError:
                 _LOGGER.error("%s: Invalid data: %s", self, line)
                 continue
 
             if "id" in decoded_line:
-                future = self._async_pending_commands.pop(decoded_line["id"], None)
-                if future:
-                    future.set_result(decoded_line)
-                elif decoded_line["id"] == ping_id:
-                    _LOGGER.debug("%s: Ping result received: %s", self, decoded_line)
+                response_id = decoded_line["id"]
+                slot = response_id & _PENDING_MASK
+                entry = pending[slot]
+                if entry is not None and entry[0] == response_id:
+                    pending[slot] = None
+                    entry[1].set_result(decoded_line)
+                elif response_id == ping_id:
+                    debug("%s: Ping result received: %s", self, decoded_line)
                     data = {"power": decoded_line["result"][0]}
                     self._set_last_properties(data, update=True)
                     data[KEY_CONNECTED] = True
@@ -297,33 +669,54 @@ class AsyncBulb(Bulb):
                 and decoded_line["error"].get("message") in RECONNECT_ERRORS
             ):
                 message = decoded_line["error"]["message"]
-                _LOGGER.debug(
-                    "%s: %s, dropping connection and reconnecting", self, message
-                )
+                debug("%s: %s, dropping connection and reconnecting", self, message)
                 if message in BACKOFF_ERRORS:
                     # Force backoff since reconnect will not clear the quota right away
                     self._socket_backoff = True
                 return
 
             if decoded_line.get("method") != "props":
-                _LOGGER.debug("%s: props not in line: %s", self, line)
+                if debug_enabled:
+                    debug("%s: props not in line: %s", self, line)
                 continue
 
             # Update notification received
-            _LOGGER.debug("%s: New props received: %s", self, decoded_line)
+            if debug_enabled:
+                debug("%s: New props received: %s", self, decoded_line)
             self._set_last_properties(decoded_line["params"], update=True)
             data = decoded_line["params"]
-            data.update({KEY_CONNECTED: True})
+            data[KEY_CONNECTED] = True
             try:
                 self._async_callback(data)
             except Exception:  # pylint: disable=broad-except
                 _LOGGER.exception("Error while processing external callback")
 
+    async def _async_open_connection(self):
+        """Connect to the bulb with the buffered line protocol.
+
+        The protocol doubles as reader and writer, like the stream pair used
+        for the music-mode connection.
+        """
+        loop = asyncio.get_running_loop()
+        _, protocol = await loop.create_connection(_BulbProtocol, self._ip, self._port)
+        return protocol, protocol
+
     def _async_connected(self, writer, reader):
         """Called when we are successfully connected to the bulb."""
         self._async_cmd_id = 0
         self._async_writer = writer
         self._async_reader = reader
+        self._loop = asyncio.get_running_loop()
+        transport = getattr(writer, "transport", None)
+        if transport is not None:
+            # Music mode is all about per-command latency: make sure Nagle is
+            # off (not every loop/Python version disables it for us) and let
+            # writes hit the kernel immediately.
+            sock = transport.get_extra_info("socket")
+            if sock is not None:
+                with contextlib.suppress(OSError):
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            transport.set_write_buffer_limits(0)
 
     async def async_listen(self, callback):
         """
@@ -343,7 +736,7 @@ class AsyncBulb(Bulb):
         self._async_callback = callback
         try:
             async with asyncio_timeout(TIMEOUT):
-                reader, writer = await asyncio.open_connection(self._ip, self._port)
+                reader, writer = await self._async_open_connection()
             await asyncio.sleep(0.1)
         except asyncio.TimeoutError as ex:
             raise BulbException(
@@ -365,7 +758,8 @@ class AsyncBulb(Bulb):
             self._async_listen_task = None
 
     async def _async_close_reader_writer(self):
-        self._async_pending_commands = {}
+        self._async_stop_writer_task()
+        self._async_pending_commands = [None] * _PENDING_SLOTS
         if self._async_writer:
             # This is called both in async_stop_listening and
             # when the connection is dropped. Clear out the writer
@@ -385,9 +779,46 @@ class AsyncBulb(Bulb):
         self._is_listening = False
         self._async_stop_listen_task()
         await self._async_close_reader_writer()
+        self._async_discard_main_connection()
         if remove_callback:
             self._async_callback = None
 
+    def _async_discard_main_connection(self):
+        """Close a parked command connection that will not be resumed."""
+        main = self._async_main_connection
+        if main is None:
+            return
+        self._async_main_connection = None
+        if main[1] is not None:
+            with contextlib.suppress(socket.error):
+                main[1].close()
+
+    def _async_resume_main_connection(self, main):
+        """
+        Resume notifications on the parked command connection.
+
+        Returns False if the bulb dropped the connection while music mode was
+        active, in which case the caller needs a fresh ``async_listen``.
+        """
+        reader, writer = main
+        if writer is None:
+            return False
+        transport = getattr(writer, "transport", None)
+        if (
+            transport is None
+            or transport.is_closing()
+            or getattr(reader, "_eof", False)
+        ):
+            with contextlib.suppress(socket.error):
+                writer.close()
+            return False
+        self._is_listening = True
+        self._async_connected(writer, reader)
+        self._async_listen_task = asyncio.ensure_future(self._async_run_listen())
+        if self._async_callback:
+            self._async_callback({KEY_CONNECTED: True})
+        return True
+
     async def async_get_properties(
         self, requested_properties=DEFAULT_PROPS, when_on=False
     ):
@@ -421,9 +852,11 @@ class AsyncBulb(Bulb):
         if self._music_mode_state:
             return self._last_properties
         if response is not None and "result" in response:
-            properties = response["result"]
-            properties = [x if x else None for x in properties]
-            new_values = dict(zip(requested_properties, properties))
+            # Build the update in one pass; empty strings become None.
+            new_values = {
+                key: (value or None)
+                for key, value in zip(requested_properties, response["result"])
+            }
 
             # this was a music mode response, so ignore this update
             if new_values["power"] == "ok":
@@ -759,7 +1192,28 @@ class AsyncBulb(Bulb):
             # hold the lock until we are fully enabled
             async with self._async_command_lock:
                 await self.async_send_command("set_music", [1, local_ip, port])
-                await self.async_stop_listening(False)
+                # Park the command connection instead of closing it: stopping
+                # music mode can then resume notifications on it without
+                # paying for another TCP handshake.
+                self._async_discard_main_connection()
+                self._is_listening = False
+                self._async_stop_listen_task()
+                self._async_stop_writer_task()
+                self._async_pending_commands = [None] * _PENDING_SLOTS
+                # Some firmware drops the command connection while entering
+                # music mode; if it is already gone there is nothing worth
+                # parking and stopping music mode will reconnect instead.
+                if self._async_writer is not None:
+                    self._async_main_connection = (
+                        self._async_reader,
+                        self._async_writer,
+                    )
+                self._async_reader = None
+                self._async_writer = None
+                # Let the cancelled listen task run its finalizer now, while
+                # the connection attributes are cleared, so it cannot close
+                # the music-mode connection installed below.
+                await asyncio.sleep(0)
                 try:
                     async with asyncio_timeout(0.5):
                         reader, writer = await asyncio.shield(future)
@@ -828,11 +1282,17 @@ class AsyncBulb(Bulb):
             )
             return
 
+        # Grab the parked command connection before tearing down the music
+        # socket, so async_stop_listening doesn't discard it.
+        main = self._async_main_connection
+        self._async_main_connection = None
+
         # flush out music mode socket
         self._music_expect_disconnect = True
         await self.async_stop_listening(False)
         self._music_expect_disconnect = False
         self._music_mode_state = False
 
-        await self.async_listen(self._async_callback)
+        if main is None or not self._async_resume_main_connection(main):
+            await self.async_listen(self._async_callback)
         return "set_music", [0], kwargs
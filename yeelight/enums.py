@@ -1,8 +1,7 @@
-from enum import Enum
 from enum import IntEnum
 
 
-class CronType(Enum):
+class CronType(IntEnum):
     """The type of event in cron."""
 
     off = 0
@@ -19,7 +18,7 @@ class PowerMode(IntEnum):
     MOONLIGHT = 5
 
 
-class BulbType(Enum):
+class BulbType(IntEnum):
     """
     The bulb's type.
 
@@ -34,6 +33,11 @@ class BulbType(Enum):
     WhiteTemp = 2
     WhiteTempMood = 3
 
+    @classmethod
+    def _missing_(cls, value):
+        # Future bulb types shouldn't raise (or walk the member list).
+        return cls.Unknown
+
 
 class LightType(IntEnum):
     """Type of light to control."""
@@ -3,6 +3,7 @@ import colorsys
 import json
 import logging
 import socket
+from functools import lru_cache
 
 from .decorator import decorator  # type: ignore
 from .enums import BulbType
@@ -11,7 +12,9 @@ from .enums import PowerMode
 from .enums import SceneClass
 from .flow import Flow
 from .ssdp_discover import filter_lower_case_keys
+from .ssdp_discover import iter_ssdp_responses
 from .ssdp_discover import parse_capabilities
+from .ssdp_discover import parse_capabilities_filtered
 from .ssdp_discover import send_discovery_packet
 from .utils import _clamp
 from .utils import rgb_to_yeelight
@@ -22,6 +25,41 @@ try:
 except ImportError:
     from urlparse import urlparse  # type: ignore
 
+try:
+    # orjson is an optional speedup: it encodes straight to bytes and parses
+    # bytes without an intermediate decode, which matters on the music-mode
+    # hot path. The stdlib codec is used when it is not installed.
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # msgspec is another optional accelerated codec; it is used when orjson
+    # is not available. Both raise ValueError subclasses on bad input, like
+    # the stdlib codec does.
+    import msgspec.json
+except ImportError:
+    msgspec = None
+
+if orjson is not None:
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj):
+        return orjson.dumps(obj)
+
+elif msgspec is not None:
+    _json_loads = msgspec.json.decode
+    _json_dumps = msgspec.json.Encoder().encode
+else:
+    _json_loads = json.loads
+    # A precompiled encoder skips json.dumps's per-call argument handling
+    # while keeping the compact separators.
+    _compact_encode = json.JSONEncoder(separators=(",", ":")).encode
+
+    def _json_dumps(obj):
+        return _compact_encode(obj).encode("utf8")
+
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -274,6 +312,81 @@ def get_known_models():
     return list(_MODEL_SPECS.keys())
 
 
+# The fixed JSON envelope of every request: only the id, method and params
+# vary, and the substituted values are themselves JSON-encoded bytes, so no
+# dict is ever built on the send path.
+_ENVELOPE = b'{"id":%d,"method":%s,"params":%s}\r\n'
+
+
+@lru_cache(maxsize=None)
+def _method_bytes(method):
+    """Return the JSON-encoded method name (the known method set is tiny)."""
+    return _json_dumps(method)
+
+
+@lru_cache(maxsize=256)
+def _command_template_tail(method, params):
+    """Return everything after the id in the encoded request line for a command."""
+    return b',"method":%s,"params":%s}\r\n' % (
+        _method_bytes(method),
+        _json_dumps(list(params)),
+    )
+
+
+# Commands whose params are always (number, effect, duration). Their values
+# change on every call in a music-mode loop, which would defeat the template
+# cache above, but the shape is fixed, so the whole line can be assembled
+# with one bytes-formatting operation and no JSON encoder at all.
+_FIXED_SHAPE = b'{"id":%d,"method":%s,"params":[%d,%s,%d]}\r\n'
+_FIXED_SHAPE_METHODS = frozenset(
+    (
+        "set_rgb",
+        "bg_set_rgb",
+        "set_bright",
+        "bg_set_bright",
+        "set_ct_abx",
+        "bg_set_ct_abx",
+    )
+)
+
+
+def _encode_fixed(request_id, method, params):
+    """Encode a fixed-shape command directly, or return None if it isn't one."""
+    if method in _FIXED_SHAPE_METHODS and len(params) == 3:
+        value, effect, duration = params
+        if type(value) is int and type(duration) is int:
+            return _FIXED_SHAPE % (
+                request_id,
+                _method_bytes(method),
+                value,
+                _method_bytes(effect),
+                duration,
+            )
+    return None
+
+
+def _encode_command(request_id, method, params):
+    """
+    Encode a command as a JSON request line.
+
+    The request line for a given method and params is identical across calls
+    apart from the monotonically increasing request id, so everything after
+    the id is memoized and the line is assembled with a single bytes-
+    formatting call. This avoids re-running ``json.dumps`` for every frame of
+    a music-mode loop. When the params aren't hashable (or vary too much to
+    be worth caching), only the params themselves are JSON-encoded and the
+    precomputed envelope supplies the framing.
+    """
+    request = _encode_fixed(request_id, method, params)
+    if request is not None:
+        return request
+    try:
+        tail = _command_template_tail(method, tuple(params))
+    except TypeError:
+        return _ENVELOPE % (request_id, _method_bytes(method), _json_dumps(params))
+    return b'{"id":%d' % request_id + tail
+
+
 def _command_to_send_command(
     self, method, params, kwargs, effect, duration, power_mode
 ):
@@ -404,12 +517,7 @@ def discover_bulbs(timeout=2, interface=False):
 
     bulbs = []
     bulb_ips = set()
-    while True:
-        try:
-            data, addr = s.recvfrom(65507)
-        except socket.timeout:
-            break
-
+    for data, addr in iter_ssdp_responses(s):
         capabilities = parse_capabilities(data)
         parsed_url = urlparse(capabilities["Location"])
 
@@ -543,18 +651,24 @@ class Bulb(object):
                   'name': ''
                   }
         """
-        s = send_discovery_packet(timeout, ip_address=self._ip)
-
-        try:
-            data, addr = s.recvfrom(65507)
-        except socket.timeout:
-            return None
+        # Capabilities (model, fw_ver, support, ...) don't change for the
+        # lifetime of a session, so return a previously discovered set rather
+        # than paying for another timeout-long round of SSDP discovery.
+        if self._capabilities:
+            return self._capabilities
 
-        capabilities = parse_capabilities(data)
-        capabilities = filter_lower_case_keys(capabilities)
+        s = send_discovery_packet(timeout, ip_address=self._ip)
 
-        self._capabilities = capabilities
-        return capabilities
+        for data, addr in iter_ssdp_responses(s):
+            if addr[0] != self._ip:
+                # The pooled discovery socket can hold late replies from an
+                # earlier multicast round; don't cache another bulb's
+                # capabilities as this one's.
+                continue
+            capabilities = parse_capabilities_filtered(data)
+            self._capabilities = capabilities
+            return capabilities
+        return None
 
     def set_capabilities(self, capabilities):
         """Set capabilities from external discovery."""
@@ -704,7 +818,7 @@ class Bulb(object):
                     if not line:
                         continue
                     try:
-                        line = json.loads(line.decode("utf8"))
+                        line = _json_loads(line)
                     except ValueError:
                         _LOGGER.error("Invalid data: %s", line)
                         continue
@@ -799,15 +913,15 @@ class Bulb(object):
         :raises BulbException: When the bulb indicates an error condition.
         :returns: The response from the bulb.
         """
-        command = {"id": self._cmd_id, "method": method, "params": params}
-        request = (json.dumps(command, separators=(",", ":")) + "\r\n").encode("utf8")
+        request = _encode_command(self._cmd_id, method, params)
         _LOGGER.debug("%s > %s", self, request)
 
         try:
-            self._socket.send(request)
-            # This is a workaround for some firmware versions, it seems to help with the
-            # "Bulb closed the connection" issue. More discussion can be found in issue #61.
-            self._socket.send(b" ")
+            # The trailing space is a workaround for some firmware versions, it
+            # seems to help with the "Bulb closed the connection" issue. More
+            # discussion can be found in issue #61. Sending it with the command
+            # keeps the whole request to a single send call.
+            self._socket.send(request + b" ")
         except socket.error as ex:
             # Some error occurred, remove this socket in hopes that we can later
             # create a new one.
@@ -835,7 +949,7 @@ class Bulb(object):
                     continue
 
                 try:
-                    line = json.loads(line.decode("utf8"))
+                    line = _json_loads(line)
                     _LOGGER.debug("%s < %s", self, line)
                 except ValueError:
                     line = {"result": ["invalid command"]}
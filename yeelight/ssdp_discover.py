@@ -1,12 +1,70 @@
+import re
+import selectors
 import socket
+import time
+from functools import lru_cache
 
 import ifaddr
 
+_SSDP_MULTICAST_ADDRESS = "239.255.255.250"
 
+# The M-SEARCH payload for the default multicast address never changes, so
+# it is encoded once at import time; only unicast probes format a payload.
+_SSDP_DEFAULT_MSG = (
+    b"M-SEARCH * HTTP/1.1\r\n"
+    b"HOST: 239.255.255.250:1982\r\n"
+    b'MAN: "ssdp:discover"\r\n'
+    b"ST: wifi_bulb"
+)
+
+# One header line of an SSDP response: name, colon, optional whitespace,
+# value, optional trailing CR. The status line ("HTTP/1.1 200 OK") has no
+# colon after its first token and so never matches.
+_SSDP_LINE_RE = re.compile(rb"^([A-Za-z][\w-]*):[ \t]*(.*?)\r?$", re.MULTILINE)
+# The same pattern restricted to lower-case header names, i.e. the bulb's
+# capability fields; HTTP response headers start upper-case and are skipped
+# by the regex itself instead of by a second pass over the parsed dict.
+_SSDP_LOWER_LINE_RE = re.compile(rb"^([a-z][\w-]*):[ \t]*(.*?)\r?$", re.MULTILINE)
+
+# Bulb replies always carry the same small set of header names; mapping the
+# raw bytes straight to a shared str avoids a decode per key and lets every
+# parsed dict reuse the same key objects.
+_KNOWN_KEYS = {
+    key.encode("ascii"): key
+    for key in (
+        "id",
+        "model",
+        "fw_ver",
+        "support",
+        "power",
+        "bright",
+        "color_mode",
+        "ct",
+        "rgb",
+        "hue",
+        "sat",
+        "name",
+        "Location",
+        "Server",
+        "Cache-Control",
+        "Date",
+        "Ext",
+        "Host",
+        "NTS",
+        "USN",
+        "ST",
+    )
+}
+
+
+@lru_cache(maxsize=8)
 def get_ip_address(ifname):
     """
     Return the first IPv4 address of the requested interface.
 
+    The result is cached for the lifetime of the process, so repeated
+    discoveries don't re-enumerate every adapter on the machine.
+
     :param string interface: The interface to get the IPv4 address of.
 
     :returns: The interface's IPv4 address.
@@ -21,7 +79,34 @@ def get_ip_address(ifname):
     return None
 
 
-def send_discovery_packet(timeout=2, interface=False, ip_address="239.255.255.250"):
+# Discovery sockets, pooled per interface. Creating and configuring a UDP
+# socket costs several syscalls, which dominate a discovery retry loop, and
+# the multicast options only depend on the interface, so the socket is set
+# up once and reused. The timeout is still applied per call.
+#
+# Because the socket is shared, replies from an earlier round may still sit
+# in its receive buffer, and concurrent discoveries on the same interface
+# will split one reply stream between them: readers must match replies to
+# bulbs by the sender address rather than assume every datagram is theirs.
+_ssdp_sockets = {}
+
+
+def close_ssdp_sockets():
+    """Close any pooled discovery sockets (mainly for tests and shutdown)."""
+    while _ssdp_sockets:
+        _, sock = _ssdp_sockets.popitem()
+        sock.close()
+
+
+@lru_cache(maxsize=8)
+def _packed_if_addr(ifname):
+    """Return the interface's IPv4 address in the packed form IP_MULTICAST_IF takes."""
+    return socket.inet_aton(get_ip_address(ifname))
+
+
+def send_discovery_packet(
+    timeout=2, interface=False, ip_address=_SSDP_MULTICAST_ADDRESS
+):
     """
     Send SSDP discovery packet.
 
@@ -38,30 +123,121 @@ def send_discovery_packet(timeout=2, interface=False, ip_address="239.255.255.25
     :return: Socket used to send packet.
 
     """
-    msg = "\r\n".join(
-        [
-            "M-SEARCH * HTTP/1.1",
-            "HOST: " + ip_address + ":1982",
-            'MAN: "ssdp:discover"',
-            "ST: wifi_bulb",
-        ]
-    )
+    if ip_address == _SSDP_MULTICAST_ADDRESS:
+        msg = _SSDP_DEFAULT_MSG
+    else:
+        msg = (
+            "M-SEARCH * HTTP/1.1\r\n"
+            f"HOST: {ip_address}:1982\r\n"
+            'MAN: "ssdp:discover"\r\n'
+            "ST: wifi_bulb"
+        ).encode("ascii")
+
+    s = _get_ssdp_socket(interface)
+    s.settimeout(timeout)
+    s.sendto(msg, (ip_address, 1982))
+
+    return s
+
+
+def _get_ssdp_socket(interface):
+    """Return the pooled discovery socket for an interface, creating it once.
+
+    Callers that hold the socket returned by ``send_discovery_packet`` may
+    close it when they are done, as the old per-call contract allowed, so a
+    pooled socket that has been closed is replaced rather than handed out.
+    """
+    s = _ssdp_sockets.get(interface)
+    if s is not None and s.fileno() == -1:
+        s = None
+    if s is None:
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        s.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 32)
+        if interface:
+            s.setsockopt(
+                socket.IPPROTO_IP,
+                socket.IP_MULTICAST_IF,
+                _packed_if_addr(interface),
+            )
+        _ssdp_sockets[interface] = s
+    return s
+
 
-    # Set up the UDP socket.
-    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
-    s.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 32)
-    if interface:
-        s.setsockopt(
-            socket.IPPROTO_IP,
-            socket.IP_MULTICAST_IF,
-            socket.inet_aton(get_ip_address(interface)),
-        )
+def send_discovery_packets(hosts, timeout=2, interface=False):
+    """
+    Send a unicast SSDP discovery packet to each of several known bulbs.
+
+    All probes go out back to back on one pooled socket, so probing N hosts
+    costs N sendto calls and nothing else; the replies can then be collected
+    together with ``iter_ssdp_responses`` on the returned socket.
+
+    :param hosts: An iterable of bulb IP addresses to probe.
+    :param int timeout: How many seconds to wait for replies.
+    :param string interface: The interface that should be used for the probes.
+
+    :return: Socket used to send the packets.
+
+    """
+    s = _get_ssdp_socket(interface)
     s.settimeout(timeout)
-    s.sendto(msg.encode(), (ip_address, 1982))
+    sendto = s.sendto
+    for host in hosts:
+        msg = (
+            "M-SEARCH * HTTP/1.1\r\n"
+            f"HOST: {host}:1982\r\n"
+            'MAN: "ssdp:discover"\r\n'
+            "ST: wifi_bulb"
+        ).encode("ascii")
+        sendto(msg, (host, 1982))
 
     return s
 
 
+def iter_ssdp_responses(sock, timeout=None, buffer_size=4096):
+    """
+    Yield (data, address) pairs for each SSDP response received on a socket.
+
+    Responses are read with ``recvfrom_into`` into one reusable buffer
+    instead of allocating a fresh bytes object per packet. The yielded data
+    is a memoryview into that buffer and is only valid until the next
+    iteration; ``parse_capabilities`` accepts it directly.
+
+    The socket is polled non-blocking against an overall deadline, so
+    iteration stops once ``timeout`` seconds have passed in total; a
+    blocking per-packet timeout would instead restart the clock with every
+    reply and stretch discovery on busy networks.
+
+    :param socket sock: The socket returned by ``send_discovery_packet``.
+    :param float timeout: How long to collect responses for. Defaults to the
+                          socket's configured timeout.
+    :param int buffer_size: Size of the receive buffer; SSDP responses are
+                            well under 1 KB, so the default is generous.
+    """
+    if timeout is None:
+        timeout = sock.gettimeout() or 0
+    buf = bytearray(buffer_size)
+    view = memoryview(buf)
+    deadline = time.monotonic() + timeout
+    sock.setblocking(False)
+    try:
+        with selectors.DefaultSelector() as selector:
+            selector.register(sock, selectors.EVENT_READ)
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not selector.select(remaining):
+                    return
+                # Readable: drain every queued datagram before polling again.
+                while True:
+                    try:
+                        nbytes, addr = sock.recvfrom_into(buf)
+                    except BlockingIOError:
+                        break
+                    yield view[:nbytes], addr
+    finally:
+        # Pooled sockets are reused; restore blocking-with-timeout mode.
+        sock.settimeout(timeout)
+
+
 def parse_capabilities(data):
     """
     Parse SSDP discovery capabilities to a dictionary.
@@ -94,19 +270,44 @@ def parse_capabilities(data):
         ...
     }
     """
-    return dict(
-        [x.strip("\r").split(": ") for x in data.decode().split("\n") if ":" in x]
-    )
+    # A single compiled-regex scan over the raw bytes replaces the old
+    # per-line decode/split/strip chain and its pile of throwaway strings.
+    known = _KNOWN_KEYS
+    return {
+        (known.get(key) or key.decode("ascii")): value.decode("utf8")
+        for key, value in _SSDP_LINE_RE.findall(data)
+    }
+
+
+def parse_capabilities_filtered(data):
+    """
+    Parse SSDP discovery capabilities, keeping only lower case keys.
+
+    Equivalent to ``filter_lower_case_keys(parse_capabilities(data))`` in a
+    single scan: the HTTP response fields (whose names start upper case) are
+    rejected by the regex instead of being parsed and then filtered out.
+
+    :param bytes data: Original data from SSDP discovery from the bulb.
+
+    :return: Parsed response as dict, capability fields only.
+    """
+    known = _KNOWN_KEYS
+    return {
+        (known.get(key) or key.decode("ascii")): value.decode("utf8")
+        for key, value in _SSDP_LOWER_LINE_RE.findall(data)
+    }
 
 
-def filter_lower_case_keys(dict):
+def filter_lower_case_keys(caps):
     """
     Filter dict to include only lower case keys.
 
     Used to skip HTTP response fields.
 
-    :param dict: Dict with all capabilities parsed from the SSDP discovery.
+    :param caps: Dict with all capabilities parsed from the SSDP discovery.
 
     :return: Dict with lower case keys only.
     """
-    return {key: value for key, value in dict.items() if key.islower()}
+    # Header names start with a letter, so only the first character decides;
+    # checking it alone is O(1) instead of islower() walking the whole key.
+    return {key: value for key, value in caps.items() if key[:1].islower()}
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import os
 import sys
@@ -14,7 +15,11 @@ from yeelight import Bulb, BulbType
 from yeelight import enums
 from yeelight import Flow
 from yeelight import flows
+from yeelight import main
+from yeelight import ssdp_discover
 from yeelight import TemperatureTransition
+from yeelight.aio import _BulbProtocol
+from yeelight.aio import AsyncBulb
 from yeelight.enums import LightType
 from yeelight.enums import SceneClass
 from yeelight.flow import Action
@@ -434,5 +439,208 @@ class Tests(unittest.TestCase):
             assert listening_stopped_event.wait(0.5) is True
 
 
+def _reference_encode(request_id, method, params):
+    """Encode a command the way the pre-cache code did, via json.dumps."""
+    command = {"id": request_id, "method": method, "params": params}
+    return (json.dumps(command, separators=(",", ":")) + "\r\n").encode("utf8")
+
+
+class CommandEncoderTests(unittest.TestCase):
+    def test_encode_fixed_matches_json(self):
+        for method in ("set_rgb", "set_bright", "set_ct_abx", "bg_set_rgb"):
+            params = [16711680, "smooth", 300]
+            encoded = main._encode_fixed(7, method, params)
+            self.assertEqual(encoded, _reference_encode(7, method, params))
+
+    def test_encode_fixed_rejects_other_shapes(self):
+        assert main._encode_fixed(1, "set_power", ["on", "smooth", 300]) is None
+        assert main._encode_fixed(1, "set_rgb", [16711680, "smooth"]) is None
+        assert main._encode_fixed(1, "set_rgb", ["red", "smooth", 300]) is None
+
+    def test_encode_command_matches_json(self):
+        cases = [
+            ("get_prop", ["power", "bright"]),
+            ("set_power", ["on", "smooth", 300, 5]),
+            ("set_rgb", [255, "sudden", 50]),
+            ("start_cf", [2, 1, "40000, 2, 1700, 100"]),
+        ]
+        for request_id, (method, params) in enumerate(cases, start=1):
+            encoded = main._encode_command(request_id, method, params)
+            self.assertEqual(encoded, _reference_encode(request_id, method, params))
+
+    def test_encode_command_unhashable_params(self):
+        # Unhashable params skip the template cache but must encode the same.
+        params = [1, 2, ["nested"]]
+        encoded = main._encode_command(3, "set_scene", params)
+        self.assertEqual(encoded, _reference_encode(3, "set_scene", params))
+
+    def test_encode_command_id_varies_with_cached_tail(self):
+        first = main._encode_command(1, "get_prop", ["power"])
+        second = main._encode_command(2, "get_prop", ["power"])
+        self.assertEqual(first, _reference_encode(1, "get_prop", ["power"]))
+        self.assertEqual(second, _reference_encode(2, "get_prop", ["power"]))
+
+
+class NextCmdIdTests(unittest.TestCase):
+    def test_wraparound_skips_zero(self):
+        bulb = AsyncBulb(ip="")
+        bulb._async_cmd_id = 0x7FFE
+        assert bulb._next_cmd_id() == 0x7FFF
+        # 0 is reserved for the music-mode keepalive, so the id wraps to 1.
+        assert bulb._next_cmd_id() == 1
+        assert bulb._next_cmd_id() == 2
+
+
+class MainConnectionParkingTests(unittest.TestCase):
+    def setUp(self):
+        self.bulb = AsyncBulb(ip="")
+
+    def test_resume_refuses_closing_transport(self):
+        # The bulb dropped the parked connection during music mode: resume
+        # must fail so async_stop_music falls back to a fresh async_listen.
+        writer = mock.MagicMock()
+        writer.transport.is_closing.return_value = True
+        assert (
+            self.bulb._async_resume_main_connection((mock.MagicMock(), writer)) is False
+        )
+        writer.close.assert_called_once()
+        assert self.bulb._is_listening is False
+
+    def test_resume_refuses_missing_transport(self):
+        writer = mock.MagicMock()
+        writer.transport = None
+        assert (
+            self.bulb._async_resume_main_connection((mock.MagicMock(), writer)) is False
+        )
+        writer.close.assert_called_once()
+
+    def test_resume_refuses_lost_connection(self):
+        # The bulb closed the command connection during the set_music
+        # exchange, so nothing (or (None, None)) was parked.
+        assert self.bulb._async_resume_main_connection((None, None)) is False
+        assert self.bulb._is_listening is False
+
+    def test_discard_tolerates_lost_connection(self):
+        self.bulb._async_main_connection = (None, None)
+        self.bulb._async_discard_main_connection()
+        assert self.bulb._async_main_connection is None
+
+    def test_discard_closes_parked_connection(self):
+        writer = mock.MagicMock()
+        self.bulb._async_main_connection = (mock.MagicMock(), writer)
+        self.bulb._async_discard_main_connection()
+        writer.close.assert_called_once()
+        assert self.bulb._async_main_connection is None
+        # A second discard with nothing parked is a no-op.
+        self.bulb._async_discard_main_connection()
+        writer.close.assert_called_once()
+
+
+SSDP_RESPONSE = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Cache-Control: max-age=3600\r\n"
+    b"Date: \r\n"
+    b"Ext: \r\n"
+    b"Location: yeelight://192.168.1.239:55443\r\n"
+    b"Server: POSIX UPnP/1.0 YGLC/1\r\n"
+    b"id: 0x000000000015243f\r\n"
+    b"model: color\r\n"
+    b"fw_ver: 18\r\n"
+    b"support: get_prop set_default set_power toggle set_bright start_cf stop_cf"
+    b" set_scene cron_add cron_get cron_del set_ct_abx set_rgb\r\n"
+    b"power: on\r\n"
+    b"bright: 100\r\n"
+    b"color_mode: 2\r\n"
+    b"ct: 4000\r\n"
+    b"rgb: 16711680\r\n"
+    b"hue: 100\r\n"
+    b"sat: 35\r\n"
+    b"name: my_bulb\r\n"
+)
+
+
+class ParseCapabilitiesTests(unittest.TestCase):
+    def test_parse_capabilities(self):
+        caps = ssdp_discover.parse_capabilities(SSDP_RESPONSE)
+        assert caps["Location"] == "yeelight://192.168.1.239:55443"
+        assert caps["id"] == "0x000000000015243f"
+        assert caps["model"] == "color"
+        assert caps["name"] == "my_bulb"
+        # The status line has no header name and must not produce an entry.
+        assert not any("HTTP" in key for key in caps)
+
+    def test_parse_capabilities_filtered_equivalence(self):
+        filtered = ssdp_discover.parse_capabilities_filtered(SSDP_RESPONSE)
+        two_pass = ssdp_discover.filter_lower_case_keys(
+            ssdp_discover.parse_capabilities(SSDP_RESPONSE)
+        )
+        assert filtered == two_pass
+        assert "Location" not in filtered
+        assert filtered["power"] == "on"
+
+    def test_parse_capabilities_bare_newlines(self):
+        caps = ssdp_discover.parse_capabilities(SSDP_RESPONSE.replace(b"\r\n", b"\n"))
+        assert caps == ssdp_discover.parse_capabilities(SSDP_RESPONSE)
+
+    def test_parse_capabilities_memoryview(self):
+        # iter_ssdp_responses yields memoryviews into its receive buffer.
+        caps = ssdp_discover.parse_capabilities(memoryview(SSDP_RESPONSE))
+        assert caps == ssdp_discover.parse_capabilities(SSDP_RESPONSE)
+
+
+class SSDPSocketPoolTests(unittest.TestCase):
+    def tearDown(self):
+        ssdp_discover.close_ssdp_sockets()
+
+    def test_pool_reuses_socket(self):
+        first = ssdp_discover._get_ssdp_socket(False)
+        assert ssdp_discover._get_ssdp_socket(False) is first
+
+    def test_pool_replaces_closed_socket(self):
+        # Callers may close the socket send_discovery_packet returns; the
+        # pool must hand out a fresh one instead of the dead descriptor.
+        first = ssdp_discover._get_ssdp_socket(False)
+        first.close()
+        replacement = ssdp_discover._get_ssdp_socket(False)
+        assert replacement is not first
+        assert replacement.fileno() != -1
+
+
+class BulbProtocolTests(unittest.TestCase):
+    def setUp(self):
+        self.protocol = _BulbProtocol()
+
+    def _feed(self, data):
+        while data:
+            buf = self.protocol.get_buffer(len(data))
+            chunk = data[: len(buf)]
+            buf[: len(chunk)] = chunk
+            # The transport releases its view before the next get_buffer.
+            buf.release()
+            self.protocol.buffer_updated(len(chunk))
+            data = data[len(chunk) :]
+
+    def test_line_splitting(self):
+        self._feed(b'{"id": 1}\r\n{"id"')
+        assert self.protocol.readline_nowait() == b'{"id": 1}\r\n'
+        assert self.protocol.readline_nowait() is None
+        self._feed(b": 2}\r\n")
+        assert self.protocol.readline_nowait() == b'{"id": 2}\r\n'
+
+    def test_many_lines_in_one_read(self):
+        self._feed(b"a\nb\nc\n")
+        lines = [self.protocol.readline_nowait() for _ in range(3)]
+        assert lines == [b"a\n", b"b\n", b"c\n"]
+        assert self.protocol.readline_nowait() is None
+
+    def test_overlong_line_raises_value_error(self):
+        # A peer that never sends a newline must not grow the buffer without
+        # bound: past the 64 KiB limit readline raises, and the connection
+        # loop's "Overran buffer" handler drops the connection.
+        self._feed(b"x" * (64 * 1024))
+        with self.assertRaises(ValueError):
+            asyncio.run(self.protocol.readline())
+
+
 if __name__ == "__main__":
     unittest.main()